@@ -1,74 +1,90 @@
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.database import get_db, get_admin_db
 from ..models.models import User, Admin
 from ..schemas.schemas import TokenData
 from ..core.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Argon2id with OWASP-recommended parameters (64 MB memory, 3 iterations, 2 lanes)
+pwd_hasher = PasswordHasher(time_cost=3, memory_cost=65536, parallelism=2, hash_len=32, salt_len=16)
+
+# Hoisted once: key bytes for HS256 signing and the default token lifetime
+_SECRET_KEY_BYTES = SECRET_KEY.encode()
+_DEFAULT_TOKEN_EXPIRES = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 admin_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="admin/login")
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return pwd_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return pwd_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.now(timezone.utc) + expires_delta
-    else:
-        expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    expire = datetime.now(timezone.utc) + (expires_delta or _DEFAULT_TOKEN_EXPIRES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _SECRET_KEY_BYTES, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def _decode_token_username(token: str, credentials_exception: HTTPException):
+    """Decode a bearer token and return the subject username.
+
+    Shared by the user and admin guards so both run the exact same
+    decode path; each guard only differs by which database it checks.
+    """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, _SECRET_KEY_BYTES, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
-        token_data = TokenData(username=username)
+        return TokenData(username=username).username
     except JWTError:
         raise credentials_exception
-    user = db.query(User).filter(User.username == token_data.username).first()
+
+# FastAPI caches each dependency result per request keyed on the callable,
+# so any number of endpoints/guards depending on get_current_user or
+# get_current_admin share one JWT decode + one DB lookup per request.
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    username = _decode_token_username(token, credentials_exception)
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None:
         raise credentials_exception
     return user
 
-def get_current_admin(token: str = Depends(admin_oauth2_scheme), db: Session = Depends(get_admin_db)):
+async def get_current_admin(token: str = Depends(admin_oauth2_scheme), db: AsyncSession = Depends(get_admin_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate admin credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
-        raise credentials_exception
-    admin = db.query(Admin).filter(Admin.username == token_data.username).first()
+    username = _decode_token_username(token, credentials_exception)
+    admin = await db.scalar(select(Admin).where(Admin.username == username))
     if admin is None:
         raise credentials_exception
     return admin
 
 def require_admin_access(current_admin = Depends(get_current_admin)):
-    """Dependency to ensure the current user is an admin"""
+    """Dependency to ensure the current user is an admin.
+
+    Reuses the cached get_current_admin result instead of decoding the
+    token a second time.
+    """
     if not current_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -1,52 +1,42 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base
 from .config import DATABASE_URL, ADMIN_DATABASE_URL
 
-try:
-    print(f"Connecting to main database: {DATABASE_URL}")
-    engine = create_engine(DATABASE_URL)
-    
-    # Test the main database connection
-    with engine.connect() as connection:
-        print("Main database connection successful!")
-        
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    
-    # Admin database connection
-    print(f"Connecting to admin database: {ADMIN_DATABASE_URL}")
-    admin_engine = create_engine(ADMIN_DATABASE_URL)
-    
-    # Test the admin database connection
-    with admin_engine.connect() as connection:
-        print("Admin database connection successful!")
-        
-    AdminSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=admin_engine)
-    
-    Base = declarative_base()
-    
-except SQLAlchemyError as e:
-    print(f"Database connection failed: {e}")
-    print("Please check your MySQL server and database configuration")
-    raise
-except Exception as e:
-    print(f"Unexpected error: {e}")
-    raise
+# Explicitly sized connection pools. pool_pre_ping transparently replaces
+# stale MySQL connections instead of probing at import, and pool_recycle
+# stays under MySQL's wait_timeout. Keep pool_size * worker processes
+# within MySQL's max_connections.
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=20,
+    max_overflow=40,
+    pool_timeout=10,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+)
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
-# Dependency to get a main database session
-def get_db():
-    db = SessionLocal()
-    try:
+# Admin database connection
+admin_engine = create_async_engine(
+    ADMIN_DATABASE_URL,
+    pool_size=20,
+    max_overflow=40,
+    pool_timeout=10,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+)
+AdminSessionLocal = async_sessionmaker(admin_engine, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
+
+# Dependency to get a main database session. The async context manager
+# closes the session and returns its connection to the pool when the
+# dependency unwinds, so the event loop is never blocked on DB waits.
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # Dependency to get an admin database session
-def get_admin_db():
-    db = AdminSessionLocal()
-    try:
+async def get_admin_db():
+    async with AdminSessionLocal() as db:
         yield db
-    finally:
-        db.close()
-        
\ No newline at end of file
@@ -1,62 +1,134 @@
-from sqlalchemy.orm import Session
+import asyncio
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from ..models.models import User, Admin
 from ..api.auth import get_password_hash, verify_password
 
-def get_user_by_username(db: Session, username: str):
-    return db.query(User).filter(User.username == username).first()
+class UsernameExistsError(Exception):
+    """Raised when an INSERT collides with the unique username constraint."""
 
-def create_user(db: Session, username: str, email: str, password: str, is_admin: bool = False):
-    hashed_password = get_password_hash(password)
+class EmailExistsError(Exception):
+    """Raised when an INSERT collides with the unique email constraint."""
+
+class DuplicateUserError(Exception):
+    """Raised when an INSERT hits a unique constraint that could not be attributed."""
+
+# Fixed hash verified when a username does not exist, so authentication takes
+# the same CPU time whether or not the account is real (no timing oracle)
+DUMMY_HASH = get_password_hash("x" * 16)
+
+async def get_user_by_username(db: AsyncSession, username: str):
+    return await db.scalar(select(User).where(User.username == username))
+
+async def username_exists(db: AsyncSession, username: str) -> bool:
+    # SELECT EXISTS returns a single byte off the unique index instead of
+    # materializing the full row like get_user_by_username
+    return bool(await db.scalar(select(exists().where(User.username == username))))
+
+async def create_user(db: AsyncSession, username: str, email: str, password: str, is_admin: bool = False):
+    # Cheap index-only probe before paying for the Argon2 hash; the
+    # IntegrityError handler below still catches create/create races
+    if await username_exists(db, username):
+        raise UsernameExistsError(username)
+    # Argon2 is CPU-heavy; hash off the event loop
+    hashed_password = await run_in_threadpool(get_password_hash, password)
     db_user = User(username=username, email=email, hashed_password=hashed_password, is_admin=is_admin)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    try:
+        # Let the unique index reject duplicates instead of a separate
+        # SELECT round-trip before the INSERT
+        await db.commit()
+    except IntegrityError as exc:
+        await db.rollback()
+        # MySQL names the violated key at the end of the error ("Duplicate
+        # entry ... for key 'users.email'"). Match only that key name — the
+        # duplicated value earlier in the message could itself contain
+        # "email" or "username"
+        message = str(exc.orig or exc)
+        _, found, key = message.rpartition("for key ")
+        key = key if found else ""
+        if "email" in key:
+            raise EmailExistsError(email)
+        if "username" in key:
+            raise UsernameExistsError(username)
+        raise DuplicateUserError(username)
+    await db.refresh(db_user)
     return db_user
 
-def update_user(db: Session, user: User, username: str = None, email: str = None, password: str = None, is_admin: bool = None):
+async def create_users_bulk(db: AsyncSession, users: list[dict]):
+    # Hash all passwords concurrently first (argon2-cffi releases the GIL),
+    # then write every row in one executemany INSERT and one commit instead
+    # of a hash+INSERT+COMMIT round-trip per user
+    hashes = await asyncio.gather(
+        *[run_in_threadpool(get_password_hash, u["password"]) for u in users]
+    )
+    db_users = [
+        User(username=u["username"], email=u["email"], hashed_password=h, is_admin=u.get("is_admin", False))
+        for u, h in zip(users, hashes)
+    ]
+    await db.run_sync(lambda session: session.bulk_save_objects(db_users, return_defaults=False))
+    await db.commit()
+    return len(db_users)
+
+async def get_existing_usernames(db: AsyncSession, usernames: list[str]):
+    result = await db.scalars(select(User.username).where(User.username.in_(usernames)))
+    return list(result)
+
+async def get_existing_emails(db: AsyncSession, emails: list[str]):
+    result = await db.scalars(select(User.email).where(User.email.in_(emails)))
+    return list(result)
+
+async def update_user(db: AsyncSession, user: User, username: str = None, email: str = None, password: str = None, is_admin: bool = None):
     if username:
         user.username = username
     if email:
         user.email = email
     if password:
-        user.hashed_password = get_password_hash(password)
+        user.hashed_password = await run_in_threadpool(get_password_hash, password)
     if is_admin is not None:
         user.is_admin = is_admin
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
-    
-def delete_user(db: Session, user: User):
-    db.delete(user)
-    db.commit()
+
+async def delete_user(db: AsyncSession, user: User):
+    await db.delete(user)
+    await db.commit()
     return True
 
-def authenticate_user(db: Session, username: str, password: str):
-    user = get_user_by_username(db, username)
-    if not user or not verify_password(password, user.hashed_password):
-        return False
-    return user
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    user = await get_user_by_username(db, username)
+    stored_hash = user.hashed_password if user else DUMMY_HASH
+    ok = await run_in_threadpool(verify_password, password, stored_hash)
+    if user and ok:
+        return user
+    return False
 
 # Admin CRUD operations
-def get_admin_by_username(db: Session, username: str):
-    return db.query(Admin).filter(Admin.username == username).first()
+async def get_admin_by_username(db: AsyncSession, username: str):
+    return await db.scalar(select(Admin).where(Admin.username == username))
 
-def create_admin(db: Session, username: str, email: str, password: str):
-    hashed_password = get_password_hash(password)
+async def create_admin(db: AsyncSession, username: str, email: str, password: str):
+    hashed_password = await run_in_threadpool(get_password_hash, password)
     db_admin = Admin(username=username, email=email, hashed_password=hashed_password)
     db.add(db_admin)
-    db.commit()
-    db.refresh(db_admin)
+    await db.commit()
+    await db.refresh(db_admin)
     return db_admin
 
-def authenticate_admin(db: Session, username: str, password: str):
-    admin = get_admin_by_username(db, username)
-    if not admin or not verify_password(password, admin.hashed_password):
-        return False
-    return admin
+async def authenticate_admin(db: AsyncSession, username: str, password: str):
+    admin = await get_admin_by_username(db, username)
+    stored_hash = admin.hashed_password if admin else DUMMY_HASH
+    ok = await run_in_threadpool(verify_password, password, stored_hash)
+    if admin and ok:
+        return admin
+    return False
 
-def get_all_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(User).offset(skip).limit(limit).all()
+async def get_all_users(db: AsyncSession, skip: int = 0, limit: int = 100):
+    result = await db.scalars(select(User).offset(skip).limit(limit))
+    return result.all()
 
-def get_user_by_id(db: Session, user_id: int):
-    return db.query(User).filter(User.id == user_id).first()
\ No newline at end of file
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.get(User, user_id)
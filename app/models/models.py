@@ -1,20 +1,26 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, Index
 from ..core.database import Base
 
 class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, index=True, nullable=False)
+    username = Column(String(64), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(100), nullable=False)
     is_admin = Column(Boolean, default=False, nullable=False)
 
+    # Covering index so the login lookup (username -> hashed_password)
+    # is satisfied from the index alone, without touching the row
+    __table_args__ = (Index("ix_users_login", "username", "hashed_password"),)
+
 class Admin(Base):
     __tablename__ = "admins"
 
     id = Column(Integer, primary_key=True, index=True)
-    username = Column(String(50), unique=True, index=True, nullable=False)
+    username = Column(String(64), unique=True, index=True, nullable=False)
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(100), nullable=False)
-    is_super_admin = Column(Boolean, default=True, nullable=False)
\ No newline at end of file
+    is_super_admin = Column(Boolean, default=True, nullable=False)
+
+    __table_args__ = (Index("ix_admins_login", "username", "hashed_password"),)
@@ -1,65 +1,58 @@
-from pydantic import BaseModel, EmailStr, validator
+import re
+from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional
 
+# Compiled once at import; every schema shares it instead of pulling in
+# email-validator's full parsing path per field
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.com$")
+
+def _check_email(cls, v):
+    if v and not _EMAIL_RE.match(v):
+        raise ValueError('Email must contain "@" and end with ".com"')
+    return v
+
 class UserBase(BaseModel):
     username: str
-    email: EmailStr
+    email: str
     password: str
     is_admin: bool = False
-    
-    @validator('email')
-    def validate_email_format(cls, v):
-        if v and (not v.endswith('.com') or '@' not in v):
-            raise ValueError('Email must contain "@" and end with ".com"')
-        return v
+
+    _validate_email = field_validator('email')(classmethod(_check_email))
 
 class UserCreate(BaseModel):
     username: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[str] = None
     password: Optional[str] = None
     is_admin: Optional[bool] = False
-    
-    @validator('email')
-    def validate_email_format(cls, v):
-        if v and (not v.endswith('.com') or '@' not in v):
-            raise ValueError('Email must contain "@" and end with ".com"')
-        return v
+
+    _validate_email = field_validator('email')(classmethod(_check_email))
 
 class UserUpdate(BaseModel):
     username: Optional[str] = None
-    email: Optional[EmailStr] = None
+    email: Optional[str] = None
     password: Optional[str] = None
     is_admin: Optional[bool] = None
-    
-    @validator('email')
-    def validate_email_format(cls, v):
-        if v and (not v.endswith('.com') or '@' not in v):
-            raise ValueError('Email must contain "@" and end with ".com"')
-        return v
+
+    _validate_email = field_validator('email')(classmethod(_check_email))
 
 class UserResponse(BaseModel):
     id: int
     username: str
-    email: EmailStr
+    email: str
     is_admin: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class AdminBase(BaseModel):
     username: str
-    email: EmailStr
+    email: str
     password: str
-    
-    @validator('email')
-    def validate_email_format(cls, v):
-        if v and (not v.endswith('.com') or '@' not in v):
-            raise ValueError('Email must contain "@" and end with ".com"')
-        return v
+
+    _validate_email = field_validator('email')(classmethod(_check_email))
 
 class AdminCreate(BaseModel):
     username: str
-    email: EmailStr
+    email: str
     password: str
 
 class AdminLogin(BaseModel):
@@ -69,16 +62,14 @@ class AdminLogin(BaseModel):
 class AdminResponse(BaseModel):
     id: int
     username: str
-    email: EmailStr
+    email: str
     is_super_admin: bool
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class Token(BaseModel):
     access_token: str
     token_type: str
 
 class TokenData(BaseModel):
-    username: str = None
-
+    username: Optional[str] = None
@@ -1,12 +1,54 @@
 import streamlit as st
-import requests
 import json
+import requests
+import time
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-import pandas as pd
 
 # Configuration
 API_BASE_URL = "http://localhost:8000"
 
+# Shared HTTP session: keep-alive reuses one TCP socket across API calls
+# instead of paying a fresh handshake per request. cache_resource makes
+# Streamlit reruns reuse the same session object.
+@st.cache_resource
+def get_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+SESSION = get_session()
+
+# Direct urllib3 pool for the hot make_api_request path: skips requests'
+# PreparedRequest building, hook dispatch, and cookie-jar handling on every
+# call. The requests SESSION stays for helpers that want its richer API.
+@st.cache_resource
+def get_pool():
+    return urllib3.PoolManager(num_pools=1, maxsize=20, block=False, retries=Retry(3))
+
+POOL = get_pool()
+
+class _PoolResponse:
+    """Thin shim over urllib3.HTTPResponse exposing the attrs callers use"""
+    def __init__(self, response):
+        self.status_code = response.status
+        self._data = response.data
+    
+    @property
+    def text(self):
+        return self._data.decode("utf-8", errors="replace")
+    
+    def json(self):
+        return json.loads(self._data)
+
 # Page configuration
 st.set_page_config(
     page_title="FastAPI User Management",
@@ -15,8 +57,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for better styling
-st.markdown("""
+# Custom CSS, built once at import. It must still be emitted on every rerun
+# (Streamlit drops elements that are not re-rendered), but the multi-KB string
+# is no longer re-created per rerun and goes out in a single markdown call.
+_CUSTOM_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -62,7 +106,9 @@ st.markdown("""
         margin: 1rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(_CUSTOM_CSS, unsafe_allow_html=True)
 
 # Initialize session state
 if 'access_token' not in st.session_state:
@@ -74,32 +120,37 @@ def make_api_request(endpoint, method="GET", data=None, headers=None):
     """Make API request to FastAPI backend"""
     url = f"{API_BASE_URL}{endpoint}"
     
-    if headers is None:
-        headers = {}
+    # Circuit breaker: while the backend is known to be down, fail fast
+    # instead of stacking a full timeout on every button click
+    if time.time() < st.session_state.get("_api_down_until", 0):
+        st.error("Backend unreachable (cached); retry in a moment")
+        return None
     
-    if st.session_state.access_token:
-        headers["Authorization"] = f"Bearer {st.session_state.access_token}"
+    # Reuse the header dict built once at login instead of re-formatting
+    # the bearer token on every call
+    headers = {**st.session_state.get("auth_headers", {}), **(headers or {})}
     
     try:
-        # Add timeout to prevent hanging requests
-        timeout = 10  # 10 seconds timeout
-        
-        if method == "GET":
-            response = requests.get(url, headers=headers, timeout=timeout)
-        elif method == "POST":
-            response = requests.post(url, json=data, headers=headers, timeout=timeout)
-        elif method == "PUT":
-            response = requests.put(url, json=data, headers=headers, timeout=timeout)
-        elif method == "DELETE":
-            response = requests.delete(url, headers=headers, timeout=timeout)
-        
-        return response
-    except requests.exceptions.ConnectionError:
-        st.error("Cannot connect to the FastAPI backend. Please make sure it's running on http://localhost:8000")
-        return None
-    except requests.exceptions.Timeout:
+        # Generous for localhost but short enough that a dead backend
+        # surfaces quickly
+        timeout = 3  # seconds
+        
+        body = None
+        if data is not None:
+            body = json.dumps(data).encode()
+            headers["Content-Type"] = "application/json"
+        
+        response = POOL.request(method, url, body=body, headers=headers, timeout=timeout)
+        st.session_state._api_down_until = 0
+        return _PoolResponse(response)
+    except urllib3.exceptions.TimeoutError:
+        st.session_state._api_down_until = time.time() + 5
         st.error("Request timed out. The API is taking too long to respond.")
         return None
+    except urllib3.exceptions.MaxRetryError:
+        st.session_state._api_down_until = time.time() + 5
+        st.error("Cannot connect to the FastAPI backend. Please make sure it's running on http://localhost:8000")
+        return None
     except Exception as e:
         st.error(f"Error: {str(e)}")
         return None
@@ -125,6 +176,7 @@ def login_user(username, password):
     if response and response.status_code == 200:
         token_data = response.json()
         st.session_state.access_token = token_data["access_token"]
+        st.session_state.auth_headers = {"Authorization": f"Bearer {token_data['access_token']}"}
         st.session_state.current_user = username
         st.success("Login successful!")
         st.rerun()
@@ -134,30 +186,60 @@ def login_user(username, password):
 def logout_user():
     """Logout user"""
     st.session_state.access_token = None
+    st.session_state.auth_headers = {}
     st.session_state.current_user = None
     st.success("Logout successful!")
     st.rerun()
 
+# Window within which an identical repeated mutation is treated as a
+# double-click and answered from the previous response
+_WRITE_DEDUP_WINDOW = 1.0  # seconds
+
+def _submit_write(method, endpoint, data=None):
+    """Send a mutation, collapsing identical rapid repeats.
+
+    Button mashing triggers one rerun (and one call here) per click. If
+    the same op arrives again within the dedup window, replay the
+    previous response instead of issuing a duplicate request. A
+    background debounce timer is not an option in Streamlit — worker
+    threads cannot touch the UI — so dedup happens synchronously against
+    the last op recorded in session_state.
+    """
+    op = (method, endpoint, data)
+    last_op, last_time, last_response = st.session_state.get("_last_write", (None, 0.0, None))
+    if op == last_op and time.time() - last_time < _WRITE_DEDUP_WINDOW:
+        return last_response
+    response = make_api_request(endpoint, method=method, data=data)
+    st.session_state._last_write = (op, time.time(), response)
+    return response
+
+def _parse(response):
+    """Parse a response body once; fall back to the raw text on non-JSON"""
+    try:
+        return response.json()
+    except ValueError:
+        return {"detail": response.text}
+
 def create_user(username, email, password):
     """Create a new user"""
     data = {"username": username, "email": email, "password": password}
     
-    # Debug information
-    st.info(f"Attempting to create user: {username} with email: {email}")
-    st.info(f"API URL: {API_BASE_URL}/users")
-    st.info(f"Request data: {data}")
+    # Each st.info is a DOM update + websocket frame; only emit diagnostics
+    # when the sidebar debug toggle is on
+    if st.session_state.get("debug"):
+        st.info(f"POST {API_BASE_URL}/users — creating user: {username} ({email})")
     
-    response = make_api_request("/users", method="POST", data=data)
+    response = _submit_write("POST", "/users", data)
     
     if response and response.status_code == 200:
-        user_data = response.json()
+        user_data = _parse(response)
+        _cached_get.clear()
         st.success(f"User '{username}' created successfully!")
         return user_data
     elif response:
-        error_detail = response.json().get('detail', 'Unknown error')
-        st.error(f"Failed to create user: {error_detail}")
+        body = _parse(response)
+        st.error(f"Failed to create user: {body.get('detail', 'Unknown error')}")
         st.error(f"Status code: {response.status_code}")
-        st.error(f"Response: {response.text}")
     else:
         st.error("No response received from the API")
         st.error("This usually means:")
@@ -181,34 +263,47 @@ def update_user(user_id, username, email, password):
         st.warning("Please provide at least one field to update")
         return None
     
-    response = make_api_request(f"/users/{user_id}", method="PUT", data=data)
+    response = _submit_write("PUT", f"/users/{user_id}", data)
     
     if response and response.status_code == 200:
-        user_data = response.json()
+        user_data = _parse(response)
+        _cached_get.clear()
         st.success(f"User updated successfully!")
         return user_data
     elif response:
-        st.error(f"Failed to update user: {response.json().get('detail', 'Unknown error')}")
+        st.error(f"Failed to update user: {_parse(response).get('detail', 'Unknown error')}")
     return None
 
 def delete_user(user_id):
     """Delete a user"""
-    response = make_api_request(f"/users/{user_id}", method="DELETE")
+    response = _submit_write("DELETE", f"/users/{user_id}")
     
     if response and response.status_code == 200:
+        _cached_get.clear()
         st.success("User deleted successfully!")
         return True
     elif response:
-        st.error(f"Failed to delete user: {response.json().get('detail', 'Unknown error')}")
+        st.error(f"Failed to delete user: {_parse(response).get('detail', 'Unknown error')}")
     return False
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_get(endpoint, token):
+    """GET with a short-TTL cache keyed on (endpoint, token).
+
+    Streamlit reruns the whole script on every widget event; this keeps
+    tab switches from refetching identical data for 30 seconds.
+    """
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    response = SESSION.get(f"{API_BASE_URL}{endpoint}", headers=headers, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
 def get_current_user_info():
     """Get current user information"""
-    response = make_api_request("/me")
-    
-    if response and response.status_code == 200:
-        return response.json()
-    return None
+    try:
+        return _cached_get("/me", st.session_state.access_token)
+    except requests.exceptions.RequestException:
+        return None
 
 # Main application
 def main():
@@ -219,6 +314,7 @@ def main():
     
     if st.session_state.access_token:
         st.sidebar.success(f"Logged in as: {st.session_state.current_user}")
+        st.session_state.debug = st.sidebar.checkbox("Debug mode", value=st.session_state.get("debug", False))
         if st.sidebar.button("Logout"):
             logout_user()
         
@@ -316,36 +412,20 @@ def show_dashboard():
     """Display dashboard with system overview"""
     st.markdown("## Dashboard")
     
-    # Get current user info
+    # One /me fetch serves both the metric cards and the status check below
     current_user_info = get_current_user_info()
     
     if current_user_info:
-        # Display metrics
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown("""
-            <div class="metric-card">
-                <h3>Current User</h3>
-                <h2>{}</h2>
-            </div>
-            """.format(current_user_info["username"]), unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown("""
-            <div class="metric-card">
-                <h3>Email</h3>
-                <h4>{}</h4>
-            </div>
-            """.format(current_user_info["email"]), unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown("""
-            <div class="metric-card">
-                <h3>User ID</h3>
-                <h2>{}</h2>
-            </div>
-            """.format(current_user_info["id"]), unsafe_allow_html=True)
+        # Display metrics: one f-string, one markdown call, one websocket
+        # frame instead of three .format() templates in three columns
+        st.markdown(
+            f'''<div style="display: flex; gap: 1rem;">
+                <div class="metric-card" style="flex: 1;"><h3>Current User</h3><h2>{current_user_info["username"]}</h2></div>
+                <div class="metric-card" style="flex: 1;"><h3>Email</h3><h4>{current_user_info["email"]}</h4></div>
+                <div class="metric-card" style="flex: 1;"><h3>User ID</h3><h2>{current_user_info["id"]}</h2></div>
+            </div>''',
+            unsafe_allow_html=True,
+        )
         
         st.markdown("---")
         
@@ -372,16 +452,15 @@ def show_dashboard():
         st.markdown("---")
         st.markdown("### System Status")
         
-        # Test API connection
-        response = make_api_request("/me")
-        if response and response.status_code == 200:
-            st.success("Backend API is running and accessible")
-        else:
-            st.error("Backend API is not accessible")
+        # The user info above just came over the wire, so the backend is
+        # by definition reachable — no second probe request needed
+        st.success("Backend API is running and accessible")
         
         # Current session info
         st.info(f"Session started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         st.info(f"Token type: Bearer")
+    else:
+        st.error("Backend API is not accessible")
 
 def show_user_management():
     """Display user management overview"""
@@ -403,8 +482,7 @@ def show_user_management():
     current_user_info = get_current_user_info()
     if current_user_info:
         st.markdown("### Current User Information")
-        user_df = pd.DataFrame([current_user_info])
-        st.dataframe(user_df, use_container_width=True)
+        st.json(current_user_info)
     
     # API endpoints information
     st.markdown("---")
@@ -465,8 +543,7 @@ def show_create_user():
                 if user_data:
                     st.markdown("---")
                     st.markdown("### User Created Successfully")
-                    user_df = pd.DataFrame([user_data])
-                    st.dataframe(user_df, use_container_width=True)
+                    st.json(user_data)
 
 def show_update_user():
     """Display update user form"""
@@ -512,8 +589,7 @@ def show_update_user():
                 if user_data:
                     st.markdown("---")
                     st.markdown("### User Updated Successfully")
-                    user_df = pd.DataFrame([user_data])
-                    st.dataframe(user_df, use_container_width=True)
+                    st.json(user_data)
 
 def show_delete_user():
     """Display delete user form"""
@@ -572,17 +648,17 @@ def show_my_profile():
         col1, col2 = st.columns([1, 2])
         
         with col1:
-            st.markdown("""
-            <div class="metric-card">
-                <h3>Profile</h3>
-                <h2>{}</h2>
-                <p>User ID: {}</p>
-            </div>
-            """.format(current_user_info["username"], current_user_info["id"]), unsafe_allow_html=True)
+            st.markdown(
+                f'''<div class="metric-card">
+                    <h3>Profile</h3>
+                    <h2>{current_user_info["username"]}</h2>
+                    <p>User ID: {current_user_info["id"]}</p>
+                </div>''',
+                unsafe_allow_html=True,
+            )
         
         with col2:
-            user_df = pd.DataFrame([current_user_info])
-            st.dataframe(user_df, use_container_width=True)
+            st.json(current_user_info)
         
         # Session information
         st.markdown("---")
@@ -597,8 +673,7 @@ def show_my_profile():
             "Token Status": "Valid" if st.session_state.access_token else "Invalid"
         }
         
-        session_df = pd.DataFrame(list(session_info.items()), columns=["Property", "Value"])
-        st.dataframe(session_df, use_container_width=True)
+        st.json(session_info)
         
         # Actions
         st.markdown("---")
@@ -7,9 +7,9 @@ Run this script to start either the backend or frontend
 import subprocess
 import sys
 import os
-import time
+import threading
 
-def run_backend():
+def run_backend(dev=False):
     """Start the FastAPI backend server"""
     print("Starting FastAPI Backend Server...")
     print("Server will be available at: http://localhost:8001")
@@ -17,9 +17,17 @@ def run_backend():
     print("Press Ctrl+C to stop the server")
     print("-" * 50)
     
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8001"]
+    if dev:
+        # --reload implies a single process, so it is mutually exclusive
+        # with --workers
+        cmd += ["--reload"]
+    else:
+        # uvloop (C event loop) + httptools (C HTTP parser), one worker per core
+        cmd += ["--loop", "uvloop", "--http", "httptools", "--workers", str(os.cpu_count() or 2)]
+    
     try:
-        # Start the FastAPI server
-        subprocess.run([sys.executable, "-m", "uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8001", "--reload"])
+        subprocess.run(cmd)
     except KeyboardInterrupt:
         print("\nBackend server stopped")
     except Exception as e:
@@ -40,15 +48,53 @@ def run_frontend():
     except Exception as e:
         print(f"Error starting frontend: {e}")
 
+def run_both():
+    """Start backend and frontend in one interpreter.
+
+    uvicorn runs in-process on a background thread and Streamlit takes the
+    main thread, so the heavy shared imports are paid once instead of once
+    per subprocess, and there is no sleep-based startup race.
+    """
+    import uvicorn
+    from streamlit.web import bootstrap
+
+    print("Backend: http://localhost:8001")
+    print("Frontend: http://localhost:8502")
+    print("API Docs: http://localhost:8001/docs")
+    print("-" * 50)
+
+    config = uvicorn.Config("app.main:app", host="0.0.0.0", port=8001, log_level="info", loop="uvloop", http="httptools")
+    server = uvicorn.Server(config)
+    backend_thread = threading.Thread(target=server.run, daemon=True)
+    backend_thread.start()
+    print("Backend started successfully!")
+
+    try:
+        # bootstrap.run does not apply flag_options itself — Streamlit's CLI
+        # loads them into the config before calling it, so do the same here
+        bootstrap.load_config_options(flag_options={"server.port": 8502})
+        bootstrap.run("frontend.py", "", [], {"server.port": 8502})
+    except KeyboardInterrupt:
+        print("\nFrontend stopped")
+    finally:
+        print("Stopping backend...")
+        server.should_exit = True
+        backend_thread.join()
+        print("Backend stopped")
+
 def check_dependencies():
     """Check if required packages are installed"""
-    required_packages = ["fastapi", "uvicorn", "streamlit", "requests", "pandas"]
+    from importlib.metadata import PackageNotFoundError, distribution
+    
+    required_packages = ["fastapi", "uvicorn", "streamlit", "requests"]
     missing_packages = []
     
     for package in required_packages:
         try:
-            __import__(package)
-        except ImportError:
+            # Query installed metadata instead of importing the package;
+            # a file stat per package rather than executing its init code
+            distribution(package)
+        except PackageNotFoundError:
             missing_packages.append(package)
     
     if missing_packages:
@@ -66,6 +112,9 @@ def main():
     print("FastAPI User Management System")
     print("=" * 50)
     
+    # Pass --dev to run the backend single-process with auto-reload
+    dev = "--dev" in sys.argv
+    
     # Check dependencies
     if not check_dependencies():
         sys.exit(1)
@@ -81,36 +130,14 @@ def main():
             choice = input("\nEnter your choice (1-4): ").strip()
             
             if choice == "1":
-                run_backend()
+                run_backend(dev=dev)
                 break
             elif choice == "2":
                 run_frontend()
                 break
             elif choice == "3":
                 print("\nStarting both backend and frontend...")
-                print("Backend: http://localhost:8001")
-                print("Frontend: http://localhost:8502")
-                print("API Docs: http://localhost:8001/docs")
-                print("\nStarting backend in 3 seconds...")
-                time.sleep(3)
-                
-                # Start backend in background
-                backend_process = subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8001"])
-                
-                print("Backend started successfully!")
-                print("Starting frontend in 3 seconds...")
-                time.sleep(3)
-                
-                # Start frontend
-                try:
-                    subprocess.run([sys.executable, "-m", "streamlit", "run", "frontend.py", "--server.port", "8502"])
-                except KeyboardInterrupt:
-                    print("\nFrontend stopped")
-                finally:
-                    print("Stopping backend...")
-                    backend_process.terminate()
-                    backend_process.wait()
-                    print("Backend stopped")
+                run_both()
                 break
             elif choice == "4":
                 print("Goodbye!")